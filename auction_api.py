@@ -1,16 +1,97 @@
+import queue
 import sqlite3
-from flask import Flask, request, jsonify
+import threading
+from contextlib import contextmanager
+import orjson
+from flask import Flask, Response, request
 from flask_cors import CORS
 
+from db import configure
+
 DB_PATH = "auctions.db"
 
+# Columns returned by the API, in response order
+COLUMNS = ("auction_id", "price", "timestamp", "bin", "id", "item_attributes")
+SELECT_COLUMNS = ", ".join(COLUMNS)
+
 app = Flask(__name__)
 CORS(app)
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+class ConnectionPool:
+    """Fixed-size pool of configured read connections, opened on first use."""
+
+    def __init__(self, path, maxsize=8):
+        self.path = path
+        self.maxsize = maxsize
+        self._idle = queue.LifoQueue(maxsize=maxsize)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        return configure(sqlite3.connect(self.path, check_same_thread=False))
+
+    def get(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.maxsize:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._idle.get()
+
+    def put(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put_nowait(conn)
+
+pool = ConnectionPool(DB_PATH, maxsize=8)
+
+@contextmanager
+def borrow():
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
+
+# One fixed statement per (column, direction), built once so each request only
+# does a dict lookup and hits sqlite3's prepared-statement cache.
+SORT_QUERIES = {}
+
+# Used when sort_by is missing or unknown, which is most requests
+DEFAULT_SORT_QUERIES = {
+    direction: f"SELECT {SELECT_COLUMNS} FROM auctions ORDER BY timestamp {direction} LIMIT ?"
+    for direction in ("ASC", "DESC")
+}
+
+def load_sort_queries(conn):
+    """Build SORT_QUERIES from the auctions columns on first use.
+
+    The schema does not change at runtime, so this reads PRAGMA table_info
+    only until the auctions table exists; before that it stays empty and is
+    retried on the next request.
+    """
+    global SORT_QUERIES
+    if not SORT_QUERIES:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(auctions)")]
+        SORT_QUERIES = {
+            (column, direction): f'SELECT {SELECT_COLUMNS} FROM auctions ORDER BY "{column}" {direction} LIMIT ?'
+            for column in columns
+            for direction in ("ASC", "DESC")
+        }
+    return SORT_QUERIES
+
+def row_to_dict(row):
+    return {k: v for k, v in zip(COLUMNS, row) if v is not None}
+
+def json_response(payload, status=200):
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
 
 @app.route('/auctions', methods=['GET'])
 def get_auctions():
@@ -23,45 +104,39 @@ def get_auctions():
     except ValueError:
         limit = 100
 
-    conn = get_db_connection()
-    c = conn.cursor()
-
-    # Get the total number of entries
-    c.execute("SELECT COUNT(*) FROM auctions")
-    total_count = c.fetchone()[0]
-
-    # Get valid columns for validation
-    c.execute("PRAGMA table_info(auctions)")
-    columns = {row['name'] for row in c.fetchall()}
+    with borrow() as conn:
+        c = conn.cursor()
 
-    base_query = "SELECT * FROM auctions"
+        # Get the total number of entries (kept up to date by triggers)
+        try:
+            count_row = c.execute("SELECT n FROM table_counts WHERE name = 'auctions'").fetchone()
+        except sqlite3.OperationalError:
+            # Database not migrated by the scraper's init_db yet
+            count_row = None
+        if count_row is None:
+            count_row = c.execute("SELECT COUNT(*) FROM auctions").fetchone()
+        total_count = count_row[0]
 
-    # Validate and use flat columns for sorting
-    if sort_by and sort_by in columns:
-        base_query += f' ORDER BY "{sort_by}" {order.upper()}'
-    else:
-        base_query += f" ORDER BY timestamp {order.upper()}"
-
-    base_query += f" LIMIT ?"
-    rows = c.execute(base_query, (limit,)).fetchall()
-    conn.close()
+        # Unknown columns fall back to timestamp ordering
+        direction = "DESC" if order == "desc" else "ASC"
+        query = load_sort_queries(conn).get((sort_by, direction)) or DEFAULT_SORT_QUERIES[direction]
+        rows = c.execute(query, (limit,)).fetchall()
 
     # Return the count and the data
-    return jsonify({
+    return json_response({
         "total_count": total_count,
-        "auctions": [{k: v for k, v in dict(row).items() if v is not None} for row in rows]
+        "auctions": [row_to_dict(row) for row in rows]
     })
 
 @app.route('/auction/<auction_id>', methods=['GET'])
 def get_auction(auction_id):
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute("SELECT * FROM auctions WHERE auction_id = ?", (auction_id,))
-    row = c.fetchone()
-    conn.close()
+    with borrow() as conn:
+        c = conn.cursor()
+        c.execute(f"SELECT {SELECT_COLUMNS} FROM auctions WHERE auction_id = ?", (auction_id,))
+        row = c.fetchone()
     if row:
-        return jsonify({k: v for k, v in dict(row).items() if v is not None})
-    return jsonify({"error": "Not found"}), 404
+        return json_response(row_to_dict(row))
+    return json_response({"error": "Not found"}, status=404)
 
 @app.route('/auctions/by_id/<item_id>', methods=['GET'])
 def get_auctions_by_item_id(item_id):
@@ -70,17 +145,17 @@ def get_auctions_by_item_id(item_id):
         limit = int(limit)
     except ValueError:
         limit = 100
-    conn = get_db_connection()
-    c = conn.cursor()
-    # Try both "item_id" and "id" as column, fallback to "item_id"
-    query = """
-        SELECT * FROM auctions
-        WHERE id = ?
-        LIMIT ?
-    """
-    rows = c.execute(query, (item_id, limit)).fetchall()
-    conn.close()
-    return jsonify([{k: v for k, v in dict(row).items() if v is not None} for row in rows])
+    with borrow() as conn:
+        c = conn.cursor()
+        # Try both "item_id" and "id" as column, fallback to "item_id"
+        query = f"""
+            SELECT {SELECT_COLUMNS} FROM auctions
+            WHERE id = ?
+            LIMIT ?
+        """
+        rows = c.execute(query, (item_id, limit)).fetchall()
+    return json_response([row_to_dict(row) for row in rows])
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8080, debug=True)  # Accessible on local network
\ No newline at end of file
+    # Development server only; use wsgi.py with gunicorn in production
+    app.run(host='0.0.0.0', port=8080)  # Accessible on local network
\ No newline at end of file
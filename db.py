@@ -0,0 +1,13 @@
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+def configure(conn):
+    """Apply WAL mode and cache/mmap tuning to a fresh connection."""
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
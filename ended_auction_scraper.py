@@ -1,18 +1,58 @@
 import requests
-import nbt
-import io
-import base64
+from requests.adapters import HTTPAdapter
+import gzip
 import json
+import orjson
 import logging
 import os
+import re
 import time
 import sqlite3
-from typing import Dict, Any, Tuple, List, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Tuple, List, Optional, Set
+
+from db import configure
+from nbt_reader import read_nbt
+
+try:
+    # SIMD-accelerated (libbase64) drop-in for base64.b64decode
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
 
 # Configuration
 API_URL = "https://api.hypixel.net/skyblock/auctions_ended"
 API_KEY = os.getenv("HYPIXEL_API_KEY")
 
+# Reused across polls so the TCP/TLS connection to the API is kept alive
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+if API_KEY:
+    SESSION.headers["API-Key"] = API_KEY
+
+# Comma-separated item ids to keep (e.g. "HYPERION,PET_WOLF"). Empty stores everything.
+INTERESTING_IDS: Set[str] = {i.strip() for i in os.getenv("INTERESTING_IDS", "").split(",") if i.strip()}
+
+# Byte patterns searched for in the raw NBT before parsing. Pets are stored with
+# id "PET" and their type inside the petInfo JSON, so PET_* ids also match on the
+# bare type name, whatever the JSON spacing around it.
+PREFILTER_TAGS: Set[bytes] = {i.encode() for i in INTERESTING_IDS} | {
+    i[4:].encode() for i in INTERESTING_IDS if i.startswith("PET_")
+}
+FILTERED_ERROR = "Item id not in INTERESTING_IDS"
+
+# petInfo is compact JSON written by Hypixel; pull "type" without a full parse
+PET_TYPE_RE = re.compile(r'"type"\s*:\s*"([^"]+)"')
+
+# (auction_id, price, timestamp, bin, id, item_attributes) in INSERT_SQL order
+AuctionRow = Tuple[str, float, int, int, Optional[str], str]
+# The same fields as six parallel lists, one entry per auction
+AuctionColumns = Tuple[List[str], List[float], List[int], List[int], List[Optional[str]], List[str]]
+
+# Auctions handed to each worker task
+BATCH_SIZE = 256
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Setup logging
@@ -21,6 +61,21 @@ os.makedirs(log_dir, exist_ok=True)
 log_path = os.path.join(log_dir, "auction_task.log")
 DB_PATH = os.path.join(BASE_DIR, "auctions.db")
 
+INSERT_SQL = (
+    "INSERT OR IGNORE INTO auctions (auction_id, price, timestamp, bin, id, item_attributes) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+# Frequently used item attributes exposed as real columns, computed from
+# item_attributes by SQLite so readers don't need to parse the JSON.
+GENERATED_COLUMNS = (
+    ("count", "INTEGER"),
+    ("modifier", "TEXT"),
+    ("rarity_upgrades", "INTEGER"),
+    ("hot_potato_count", "INTEGER"),
+    ("dungeon_item_level", "INTEGER"),
+)
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
@@ -30,17 +85,11 @@ logging.basicConfig(
     ]
 )
 
-def nbt_to_dict(nbt_obj):
-    """Recursively convert an NBT tag into a Python dict or value."""
-    if hasattr(nbt_obj, 'tags'):  # TAG_Compound or TAG_List
-        if isinstance(nbt_obj.tags, list):
-            return {tag.name: nbt_to_dict(tag) for tag in nbt_obj.tags}
-        else:
-            return [nbt_to_dict(tag) for tag in nbt_obj.tags]
-    elif hasattr(nbt_obj, 'value'):
-        return nbt_obj.value
-    else:
-        return str(nbt_obj)
+def _json_default(obj):
+    """orjson fallback: NBT byte arrays are stored as text."""
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode("utf-8", "replace")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
 def decode_inventory_data(raw: str) -> Dict[str, Any]:
     """Decode base64 NBT item data from Hypixel auctions. Returns item attributes."""
@@ -49,38 +98,41 @@ def decode_inventory_data(raw: str) -> Dict[str, Any]:
         return {"error": "Empty raw data"}
 
     try:
-        nbt_data = base64.b64decode(raw)
-        nbt_file = nbt.nbt.NBTFile(fileobj=io.BytesIO(nbt_data))
+        nbt_data = gzip.decompress(b64decode(raw))
+
+        if PREFILTER_TAGS and not any(tag in nbt_data for tag in PREFILTER_TAGS):
+            # Cheap substring check first; false positives are caught after the parse
+            return {"error": FILTERED_ERROR}
+
+        nbt_root = read_nbt(nbt_data)
 
-        if "i" not in nbt_file:
+        if "i" not in nbt_root:
             return {"error": "No 'i' key in NBT data"}
 
-        items = nbt_file["i"]
-        if not items or len(items) == 0:
+        items = nbt_root["i"]
+        if not items:
             return {"error": "No items in inventory"}
 
         item = items[0]
         result = {}
         if "Count" in item:
-            result["count"] = item["Count"].value
+            result["count"] = item["Count"]
 
         # If there are no ExtraAttributes, return basic info
-        if "tag" not in item or "ExtraAttributes" not in item["tag"]:
+        extra_attrs = item.get("tag", {}).get("ExtraAttributes")
+        if extra_attrs is None:
             return result
 
-        extra_attrs = item["tag"]["ExtraAttributes"]
-        for k, v in extra_attrs.items():
-            try:
-                result[k] = nbt_to_dict(v)
-            except Exception as e:
-                logging.debug(f"Error extracting attribute {k}: {e}")
-                result[k] = str(v)
+        result.update(extra_attrs)
 
         # SPECIAL: If this is a pet, update id to PET_<TYPE>
         if result.get("id") == "PET" and "petInfo" in result:
             try:
-                pet_info = json.loads(result["petInfo"])
-                pet_type = pet_info.get("type")
+                match = PET_TYPE_RE.search(result["petInfo"])
+                if match:
+                    pet_type = match.group(1)
+                else:
+                    pet_type = orjson.loads(result["petInfo"]).get("type")
                 if pet_type:
                     result["id"] = f"PET_{pet_type.upper()}"
             except Exception as e:
@@ -93,12 +145,8 @@ def decode_inventory_data(raw: str) -> Dict[str, Any]:
         return {"error": str(e)}
 
 def fetch_auctions() -> Tuple[List[Dict], int]:
-    headers = {}
-    if API_KEY:
-        headers["API-Key"] = API_KEY
-
     try:
-        resp = requests.get(API_URL, headers=headers, timeout=30)
+        resp = SESSION.get(API_URL, timeout=30)
         resp.raise_for_status()
         data = resp.json()
 
@@ -123,7 +171,7 @@ def fetch_auctions() -> Tuple[List[Dict], int]:
 
 def init_db():
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = configure(sqlite3.connect(DB_PATH))
         c = conn.cursor()
 
         c.execute("""
@@ -141,6 +189,45 @@ def init_db():
             CREATE INDEX IF NOT EXISTS idx_timestamp ON auctions(timestamp)
         """)
 
+        # Serves WHERE id = ? lookups and their timestamp ordering
+        c.execute("""
+            CREATE INDEX IF NOT EXISTS idx_id_ts ON auctions(id, timestamp DESC)
+        """)
+
+        # SQLite can only add VIRTUAL generated columns to an existing table;
+        # values are computed when read, so inserts pay nothing for them.
+        existing = {row[1] for row in c.execute("PRAGMA table_xinfo(auctions)")}
+        for name, col_type in GENERATED_COLUMNS:
+            if name not in existing:
+                c.execute(f"""
+                    ALTER TABLE auctions ADD COLUMN "{name}" {col_type}
+                    GENERATED ALWAYS AS (json_extract(item_attributes, '$.{name}')) VIRTUAL
+                """)
+
+        # Row count maintained by triggers so readers don't need COUNT(*)
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS table_counts (
+                name TEXT PRIMARY KEY,
+                n INTEGER NOT NULL
+            )
+        """)
+        c.execute("""
+            INSERT OR IGNORE INTO table_counts (name, n)
+            SELECT 'auctions', COUNT(*) FROM auctions
+        """)
+        c.execute("""
+            CREATE TRIGGER IF NOT EXISTS auctions_count_insert AFTER INSERT ON auctions
+            BEGIN
+                UPDATE table_counts SET n = n + 1 WHERE name = 'auctions';
+            END
+        """)
+        c.execute("""
+            CREATE TRIGGER IF NOT EXISTS auctions_count_delete AFTER DELETE ON auctions
+            BEGIN
+                UPDATE table_counts SET n = n - 1 WHERE name = 'auctions';
+            END
+        """)
+
         conn.commit()
         logging.info("Database initialized successfully")
 
@@ -151,7 +238,33 @@ def init_db():
         if 'conn' in locals():
             conn.close()
 
-def process_auction(auction_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+def find_known_auction_ids(auction_ids: List[str]) -> Set[str]:
+    """Return the subset of auction_ids already stored, so they can skip decoding."""
+    known = set()
+    if not auction_ids:
+        return known
+
+    try:
+        conn = configure(sqlite3.connect(DB_PATH))
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(auction_ids), 500):
+            chunk = auction_ids[start:start + 500]
+            placeholders = ', '.join(['?'] * len(chunk))
+            rows = conn.execute(
+                f"SELECT auction_id FROM auctions WHERE auction_id IN ({placeholders})",
+                chunk
+            )
+            known.update(row[0] for row in rows)
+
+    except Exception as e:
+        logging.error(f"Error looking up known auctions: {e}")
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+    return known
+
+def process_auction(auction_data: Dict[str, Any]) -> Optional[AuctionRow]:
     """Process a single auction's data and item attributes, making 'id' its own column."""
     try:
         auction_id = auction_data.get("auction_id")
@@ -162,54 +275,68 @@ def process_auction(auction_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         item_bytes = auction_data.get("item_bytes", "")
         attrs = decode_inventory_data(item_bytes)
 
+        if attrs.get("error") == FILTERED_ERROR:
+            logging.debug(f"Skipping auction {auction_id}: item prefiltered out")
+            return None
+
         if "error" in attrs:
             logging.warning(f"Failed to decode item for auction {auction_id}: {attrs['error']}")
             attrs = {}
 
-        # Move id (item id) to top-level, keep rest in item_attributes
+        # Move id (item id) to top-level, keep rest in item_attributes; attrs is
+        # freshly decoded, so popping is the cheapest way to keep id out of the JSON
         item_id = attrs.pop("id", None)
         item_attributes = attrs  # All other attributes (except id)
 
-        return {
-            "auction_id": auction_id,
-            "price": auction_data.get("price", 0),
-            "timestamp": auction_data.get("timestamp", 0),
-            "bin": bool(auction_data.get("bin", False)),
-            "id": item_id,
-            "item_attributes": json.dumps(item_attributes)
-        }
+        if INTERESTING_IDS and item_id not in INTERESTING_IDS:
+            logging.debug(f"Skipping auction {auction_id}: item id {item_id} not in INTERESTING_IDS")
+            return None
 
+        # price and timestamp are always present on ended auctions; a row
+        # missing either raises here and is skipped below rather than stored as 0
+        return (
+            auction_id,
+            auction_data["price"],
+            auction_data["timestamp"],
+            1 if auction_data.get("bin") else 0,
+            item_id,
+            orjson.dumps(item_attributes, default=_json_default).decode()
+        )
+
+    except KeyError as e:
+        logging.warning(f"Auction {auction_data.get('auction_id')} missing field {e}, skipping")
+        return None
     except Exception as e:
         logging.error(f"Error processing auction: {e}")
         return None
 
-def save_auctions(processed_auctions: List[Dict[str, Any]]) -> int:
-    """Insert processed auctions into the database."""
-    if not processed_auctions:
+def process_auctions_batch(auctions: List[Dict[str, Any]]) -> AuctionColumns:
+    """Process a batch of auctions into parallel column lists, skipping failures."""
+    columns: AuctionColumns = ([], [], [], [], [], [])
+    appends = [column.append for column in columns]
+    for auction in auctions:
+        row = process_auction(auction)
+        if row:
+            for append, value in zip(appends, row):
+                append(value)
+    return columns
+
+def save_auctions(columns: AuctionColumns) -> int:
+    """Insert processed auction columns into the database."""
+    if not columns[0]:
         return 0
 
     saved_count = 0
 
     try:
-        conn = sqlite3.connect(DB_PATH)
-
-        for auction in processed_auctions:
-            columns = ', '.join(f'"{col}"' for col in auction.keys())
-            placeholders = ', '.join(['?'] * len(auction))
-            values = list(auction.values())
+        conn = configure(sqlite3.connect(DB_PATH, isolation_level="IMMEDIATE"))
 
-            try:
-                conn.execute(
-                    f'INSERT INTO auctions ({columns}) VALUES ({placeholders})',
-                    values
-                )
-                saved_count += 1
-            except sqlite3.IntegrityError:
-                logging.debug(f"Duplicate auction_id {auction['auction_id']}, skipping")
-            except Exception as e:
-                logging.error(f"Error saving auction {auction['auction_id']}: {e}")
+        # One BEGIN IMMEDIATE transaction for the whole batch; duplicates are
+        # skipped by INSERT OR IGNORE rather than raising IntegrityError.
+        with conn:
+            # rowcount excludes ignored duplicates and trigger side effects
+            saved_count = conn.executemany(INSERT_SQL, zip(*columns)).rowcount
 
-        conn.commit()
         logging.info(f"Saved {saved_count} new auctions to database")
 
     except Exception as e:
@@ -220,8 +347,12 @@ def save_auctions(processed_auctions: List[Dict[str, Any]]) -> int:
 
     return saved_count
 
-def job():
-    """Main job to fetch, process, and save auctions."""
+def job(executor: Optional[Executor] = None):
+    """Main job to fetch, process, and save auctions.
+
+    When an executor is given, auctions are decoded in its worker processes;
+    the database write stays in this process.
+    """
     try:
         logging.info("Starting auction fetch job")
         auctions, last_updated = fetch_auctions()
@@ -230,17 +361,30 @@ def job():
             logging.info("No auctions fetched")
             return
 
-        processed_auctions = []
-        for auction in auctions:
-            processed = process_auction(auction)
-            if processed:
-                processed_auctions.append(processed)
+        known = find_known_auction_ids([a["auction_id"] for a in auctions if a.get("auction_id")])
+        if known:
+            logging.info(f"Skipping {len(known)} auctions already in database")
+            auctions = [a for a in auctions if a.get("auction_id") not in known]
+
+        batches = [auctions[i:i + BATCH_SIZE] for i in range(0, len(auctions), BATCH_SIZE)]
+        if executor is not None:
+            results = executor.map(process_auctions_batch, batches)
+        else:
+            results = map(process_auctions_batch, batches)
+
+        columns: AuctionColumns = ([], [], [], [], [], [])
+        for batch in results:
+            for column, values in zip(columns, batch):
+                column.extend(values)
 
-        saved_count = save_auctions(processed_auctions)
+        saved_count = save_auctions(columns)
 
-        logging.info(f"Job completed. Processed {len(processed_auctions)} auctions, "
+        logging.info(f"Job completed. Processed {len(columns[0])} auctions, "
                      f"saved {saved_count} new ones. Last updated: {last_updated}")
 
+    except BrokenProcessPool:
+        # The pool is unusable from here on; let main() replace it
+        raise
     except Exception as e:
         logging.error(f"Job failed: {e}", exc_info=True)
 
@@ -253,18 +397,30 @@ def main():
 
     init_db()
 
-    while True:
-        try:
-            job()
-            logging.info("Sleeping for 60 seconds...")
-            time.sleep(60)
-        except KeyboardInterrupt:
-            logging.info("Received interrupt signal, shutting down...")
-            break
-        except Exception as e:
-            logging.error(f"Unexpected error in main loop: {e}")
-            logging.info("Sleeping for 60 seconds before retry...")
-            time.sleep(60)
+    # Decoding is CPU-bound, so spread it over all cores
+    executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+    try:
+        while True:
+            try:
+                job(executor)
+                logging.info("Sleeping for 60 seconds...")
+                time.sleep(60)
+            except KeyboardInterrupt:
+                logging.info("Received interrupt signal, shutting down...")
+                break
+            except BrokenProcessPool as e:
+                # A worker died (e.g. OOM-killed); a broken pool never recovers
+                logging.error(f"Decode worker pool broke, starting a new one: {e}")
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+                logging.info("Sleeping for 60 seconds before retry...")
+                time.sleep(60)
+            except Exception as e:
+                logging.error(f"Unexpected error in main loop: {e}")
+                logging.info("Sleeping for 60 seconds before retry...")
+                time.sleep(60)
+    finally:
+        executor.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
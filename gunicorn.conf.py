@@ -0,0 +1,9 @@
+import multiprocessing
+
+bind = "0.0.0.0:8080"
+
+# gevent workers for the read-heavy API; each worker process opens its own
+# SQLite connection pool on first request (nothing is shared across the fork).
+worker_class = "gevent"
+workers = min(4, multiprocessing.cpu_count())
+worker_connections = 100
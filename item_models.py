@@ -1,6 +1,5 @@
 import sqlite3
 import pandas as pd
-import json
 import xgboost as xgb
 from numpy import absolute
 from sklearn import datasets
@@ -11,43 +10,36 @@ import seaborn as sns
 from xgboost import XGBRegressor
 
 
-def flatten_dict(d, parent_key='', sep='_'):
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
-
-def flatten_data(x_series):
-    flattened = []
-
-    for row in x_series:
-        try:
-            data = json.loads(row)
-            flat = flatten_dict(data)
-            flattened.append(flat)
-        except (json.JSONDecodeError, TypeError):
-            flattened.append({})  # Handle malformed or missing JSON
-
-    return pd.DataFrame(flattened)
+# Generated columns maintained by ended_auction_scraper.init_db
+FEATURE_COLUMNS = ["count", "modifier", "rarity_upgrades", "hot_potato_count", "dungeon_item_level"]
+
+CHUNK_SIZE = 50_000
+
+def iter_item_groups(con, chunksize=CHUNK_SIZE):
+    """Yield (item_id, DataFrame) per item while reading the table in chunks."""
+    query = f"SELECT id, price, {', '.join(FEATURE_COLUMNS)} FROM auctions WHERE bin = 1 ORDER BY id"
+    pending = None
+    for chunk in pd.read_sql_query(query, con, chunksize=chunksize):
+        # An empty result still yields one empty chunk
+        if chunk.empty:
+            continue
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+        # Rows are ordered by id, so only the last id can continue into the next chunk
+        tail = chunk["id"] == chunk["id"].iloc[-1]
+        pending = chunk[tail]
+        for item_id, group_df in chunk[~tail].groupby("id", sort=False):
+            yield item_id, group_df
+    if pending is not None and not pending.empty:
+        yield pending["id"].iloc[0], pending
 
 # Connect to your SQLite database
 con = sqlite3.connect("auctions.db")
 
-# Load the entire table into a DataFrame
-df = pd.read_sql_query("SELECT * FROM auctions WHERE bin = 1", con)
+# Example: Loop through each item group, holding one item's rows at a time
+for item_id, group_df in iter_item_groups(con):
+    y = group_df["price"].values
+    x = group_df[FEATURE_COLUMNS].values
+    print(x)
 
-# Close connection (not needed after data is loaded)
 con.close()
-
-# Group the rows by item ID
-grouped = df.groupby("id")
-
-# Example: Loop through each item group
-for item_id, group_df in grouped:
-    y = group_df.iloc[:, 1].values
-    x = group_df.iloc[:, -1].values
-    print(x)
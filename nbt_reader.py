@@ -0,0 +1,141 @@
+import struct
+from typing import Any, Dict, List, Tuple
+
+# NBT tag type ids
+TAG_END = 0
+TAG_BYTE = 1
+TAG_SHORT = 2
+TAG_INT = 3
+TAG_LONG = 4
+TAG_FLOAT = 5
+TAG_DOUBLE = 6
+TAG_BYTE_ARRAY = 7
+TAG_STRING = 8
+TAG_LIST = 9
+TAG_COMPOUND = 10
+TAG_INT_ARRAY = 11
+TAG_LONG_ARRAY = 12
+
+# NBT is big-endian throughout
+_USHORT = struct.Struct(">H")
+_INT = struct.Struct(">i")
+
+# struct format characters for fixed-size tags
+_SCALAR_FORMATS = {
+    TAG_BYTE: "b",
+    TAG_SHORT: "h",
+    TAG_INT: "i",
+    TAG_LONG: "q",
+    TAG_FLOAT: "f",
+    TAG_DOUBLE: "d",
+}
+
+
+def _scalar_reader(fmt: str):
+    unpack_from = struct.Struct(">" + fmt).unpack_from
+    size = struct.calcsize(">" + fmt)
+
+    def read(data: bytes, pos: int) -> Tuple[Any, int]:
+        return unpack_from(data, pos)[0], pos + size
+
+    return read
+
+
+def _array_reader(fmt: str):
+    size = struct.calcsize(">" + fmt)
+
+    def read(data: bytes, pos: int) -> Tuple[List[Any], int]:
+        (length,) = _INT.unpack_from(data, pos)
+        pos += 4
+        return list(struct.unpack_from(f">{length}{fmt}", data, pos)), pos + size * length
+
+    return read
+
+
+def _read_string(data: bytes, pos: int) -> Tuple[str, int]:
+    (length,) = _USHORT.unpack_from(data, pos)
+    pos += 2
+    return data[pos:pos + length].decode("utf-8", "replace"), pos + length
+
+
+def _read_byte_array(data: bytes, pos: int) -> Tuple[bytes, int]:
+    (length,) = _INT.unpack_from(data, pos)
+    pos += 4
+    return bytes(data[pos:pos + length]), pos + length
+
+
+def _read_list(data: bytes, pos: int) -> Tuple[List[Any], int]:
+    item_type = data[pos]
+    (length,) = _INT.unpack_from(data, pos + 1)
+    pos += 5
+    if length <= 0:
+        return [], pos
+
+    # Lists of numbers are unpacked with a single struct call
+    fmt = _SCALAR_FORMATS.get(item_type)
+    if fmt is not None:
+        packed = struct.Struct(f">{length}{fmt}")
+        return list(packed.unpack_from(data, pos)), pos + packed.size
+
+    # Lists of strings (item lore) are the most common non-numeric case
+    if item_type == TAG_STRING:
+        unpack_length = _USHORT.unpack_from
+        items = []
+        append = items.append
+        for _ in range(length):
+            (size,) = unpack_length(data, pos)
+            pos += 2
+            append(data[pos:pos + size].decode("utf-8", "replace"))
+            pos += size
+        return items, pos
+
+    read = _READERS.get(item_type)
+    if read is None:
+        raise _unknown_tag(item_type, pos)
+    items = []
+    append = items.append
+    for _ in range(length):
+        value, pos = read(data, pos)
+        append(value)
+    return items, pos
+
+
+def _read_compound(data: bytes, pos: int) -> Tuple[Dict[str, Any], int]:
+    result = {}
+    readers = _READERS
+    read_string = _read_string
+    while True:
+        tag_type = data[pos]
+        pos += 1
+        if tag_type == TAG_END:
+            return result, pos
+        read = readers.get(tag_type)
+        if read is None:
+            raise _unknown_tag(tag_type, pos)
+        name, pos = read_string(data, pos)
+        result[name], pos = read(data, pos)
+
+
+def _unknown_tag(tag_type: int, pos: int) -> ValueError:
+    return ValueError(f"Unknown NBT tag type {tag_type} at offset {pos}")
+
+
+# Payload reader per tag type id
+_READERS = {tag: _scalar_reader(fmt) for tag, fmt in _SCALAR_FORMATS.items()}
+_READERS.update({
+    TAG_BYTE_ARRAY: _read_byte_array,
+    TAG_STRING: _read_string,
+    TAG_LIST: _read_list,
+    TAG_COMPOUND: _read_compound,
+    TAG_INT_ARRAY: _array_reader("i"),
+    TAG_LONG_ARRAY: _array_reader("q"),
+})
+
+
+def read_nbt(data: bytes) -> Dict[str, Any]:
+    """Parse uncompressed NBT bytes straight into dicts/lists. Returns the root compound."""
+    if not data or data[0] != TAG_COMPOUND:
+        raise ValueError("NBT data does not start with a compound tag")
+    _, pos = _read_string(data, 1)
+    root, _ = _read_compound(data, pos)
+    return root
@@ -0,0 +1,5 @@
+"""WSGI entrypoint for the auction API.
+
+Run with: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from auction_api import app